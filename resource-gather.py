@@ -1,91 +1,193 @@
 import argparse
+import shutil
 import subprocess
-import json
+import sys
 import os
 import csv
 from datetime import datetime
 import re
-
-# Helper function to run shell commands
-def run_command(command, check_output=True, ignore_errors=False):
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+# Optional parsers for 'oc get -o json' lists. When installed, ijson is preferred: it streams items and
+# keeps only the fields the CSVs use, trading some speed for much lower peak memory on large clusters.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    from orjson import loads as _jloads # Without ijson: faster whole-document parsing, straight from bytes
+except ImportError:
+    from json import loads as _jloads
+
+WORKLOAD_TYPES = ["deployment", "deploymentconfig", "statefulset"]
+
+# Concurrent oc calls when a namespace has to be queried on its own; the work is round-trip bound
+MAX_WORKERS = 16
+
+# Rows are emitted in bulk once gathered, so give the CSV files a large write buffer
+CSV_BUFFER_SIZE = 1 << 20
+
+# Kubernetes memory quantity, e.g. 512Mi, 1.5Gi, 1G or a plain byte count (also .5Gi and 5.Gi, as before)
+_MEM_RE = re.compile(r"^([0-9]*\.?[0-9]+\.?)([kKMGTPE]i?B?)?$")
+
+# Byte multiplier per lower-cased memory suffix, with Kubernetes quantity semantics:
+# '*i' suffixes are binary, bare SI suffixes are decimal (lower-casing is safe, as the milli 'm' never matches _MEM_RE)
+_UNIT_MULT = {
+    "": 1,
+    "ki": 1 << 10, "kib": 1 << 10, "k": 10 ** 3, "kb": 10 ** 3,
+    "mi": 1 << 20, "mib": 1 << 20, "m": 10 ** 6, "mb": 10 ** 6,
+    "gi": 1 << 30, "gib": 1 << 30, "g": 10 ** 9, "gb": 10 ** 9,
+    "ti": 1 << 40, "tib": 1 << 40, "t": 10 ** 12, "tb": 10 ** 12,
+    "pi": 1 << 50, "pib": 1 << 50, "p": 10 ** 15, "pb": 10 ** 15,
+    "ei": 1 << 60, "eib": 1 << 60, "e": 10 ** 18, "eb": 10 ** 18,
+}
+
+# Helper function to run commands, given as an argv list so no shell is forked.
+# Best-effort: failures (e.g. forbidden or missing APIs) are routine, so they yield None rather than raise
+def run_command(argv):
     try:
-        if check_output:
-            result = subprocess.run(command, capture_output=True, text=True, check=True, shell=True)
-            return result.stdout.strip()
-        else:
-            subprocess.run(command, check=True, shell=True)
-            return True
-    except subprocess.CalledProcessError as e:
-        if not ignore_errors:
-            print(f"Error executing command: {e.cmd}")
-            print(f"Stdout: {e.stdout}")
-            print(f"Stderr: {e.stderr}")
-            raise
+        result = subprocess.run(argv, capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
         return None
+    return result.stdout.strip()
+
+# Helper functions to strip a fetched object down to the fields the CSVs read:
+# names, pod placement, container/init container resources, overhead, quota hard/used,
+# limit range limits and node capacity
+def slim_containers(containers):
+    slim = []
+    for container in containers or []:
+        slim_container = {'name': container.get('name', ''), 'resources': container.get('resources', {})}
+        if 'restartPolicy' in container:
+            slim_container['restartPolicy'] = container['restartPolicy']
+        slim.append(slim_container)
+    return slim
+
+def slim_item(item):
+    metadata = item.get('metadata', {})
+    spec = item.get('spec', {})
+    status = item.get('status', {})
+    return {
+        'metadata': {'name': metadata.get('name', ''), 'namespace': metadata.get('namespace', '')},
+        'spec': {
+            'nodeName': spec.get('nodeName'),
+            'containers': slim_containers(spec.get('containers')),
+            'initContainers': slim_containers(spec.get('initContainers')),
+            'overhead': spec.get('overhead'),
+            'template': {'spec': {'containers': slim_containers(spec.get('template', {}).get('spec', {}).get('containers'))}},
+            'hard': spec.get('hard', {}),
+            'limits': spec.get('limits', []),
+        },
+        'status': {'used': status.get('used', {}), 'capacity': status.get('capacity', {})},
+    }
+
+# Helper function to run an 'oc get ... -o json' list command and return its items
+def get_items(argv):
+    if ijson is not None:
+        # Stream items off the pipe and keep only the fields the CSVs use, so neither the raw JSON
+        # text nor any full object (managedFields, status, env, volumes...) is held for the whole list
+        try:
+            proc = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except FileNotFoundError:
+            return None
+        with proc:
+            try:
+                items = [slim_item(item) for item in ijson.items(proc.stdout, 'items.item')]
+            except ijson.JSONError:
+                items = None
+        return items if proc.returncode == 0 else None
+
+    # Keep stdout as bytes; both parsers accept them, so there is no separate decode pass
+    try:
+        result = subprocess.run(argv, capture_output=True)
     except FileNotFoundError:
-        if not ignore_errors:
-            print(f"Command not found: {command.split()[0]}")
-            raise
         return None
+    if result.returncode != 0:
+        return None
+    try:
+        return _jloads(result.stdout).get('items', [])
+    except ValueError:
+        return None
+
+# Helper function to list every object of a kind in a single API round trip
+def fetch_all(kind, field_selector=None, namespaces=None):
+    selector = [f"--field-selector={field_selector}"] if field_selector else []
+    items = get_items(["oc", "get", kind, "--all-namespaces", *selector, "-o", "json"])
+    if items is None and namespaces:
+        # Restricted RBAC may only allow listing per namespace, so query each one concurrently instead
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            per_namespace = list(executor.map(lambda ns: get_items(["oc", "get", kind, "-n", ns, *selector, "-o", "json"]), namespaces))
+        items = [item for ns_items in per_namespace if ns_items for item in ns_items]
+    return items or []
+
+# Helper function to group fetched objects by their namespace
+def group_by_namespace(items):
+    by_namespace = defaultdict(list)
+    for item in items:
+        by_namespace[item.get('metadata', {}).get('namespace', '')].append(item)
+    return by_namespace
+
+# Helper function to write rows without csv.writer's per-row dialect handling. Rows are Kubernetes names and
+# unit-formatted numbers, which never need quoting; any row that would is still written through csv.writer.
+def write_plain_rows(f, writer, rows):
+    for row in rows:
+        if any(',' in value or '"' in value or '\r' in value or '\n' in value for value in row):
+            writer.writerow(row)
+        else:
+            f.write(','.join(row) + '\r\n') # Same line terminator as csv.writer
 
 # Helper function to check for required commands
 def check_prerequisites():
-    required_commands = ['oc', 'jq', 'bc']
-    for cmd in required_commands:
-        if not run_command(f"command -v {cmd}", check_output=False, ignore_errors=True):
+    required_commands = ['oc'] # jq and bc are only needed by resource-gather.sh
+    missing = [cmd for cmd in required_commands if shutil.which(cmd) is None]
+    if missing:
+        for cmd in missing:
             print(f"Error: '{cmd}' command not found. Please install it or ensure it's in your PATH.")
-            exit(1)
+        sys.exit(1)
 
 # --- Unit Conversion and Formatting Functions (Python equivalents) ---
+# Pure functions of short, highly repetitive strings ("100Mi", "500m"), so results are memoized.
+# Callers skip them for empty values.
 
+@lru_cache(maxsize=None)
 def convert_memory_to_bytes(value_with_unit):
-    if not value_with_unit:
-        return 0
-
-    # Try numfmt first if available
-    try:
-        bytes_val = run_command(f"numfmt --from=iec {value_with_unit}", ignore_errors=True)
-        if bytes_val:
-            return int(float(bytes_val)) # numfmt can return float for some inputs
-    except Exception:
-        pass # Fallback to manual parsing if numfmt fails
-
-    # Manual parsing
-    match = re.match(r"^([0-9.]+)([KMGTPEZY]i?B?)?$", value_with_unit)
+    match = _MEM_RE.match(value_with_unit)
     if not match:
         return 0
 
-    num = float(match.group(1))
+    number = match.group(1)
+    num = int(number) if number.isdigit() else float(number) # Integers stay exact, even for large Ti/Pi values
     unit = (match.group(2) or "").lower()
 
-    if unit in ['ki', 'k', 'kib']:
-        return int(num * 1024)
-    elif unit in ['mi', 'm', 'mib']:
-        return int(num * 1024 * 1024)
-    elif unit in ['gi', 'g', 'gib']:
-        return int(num * 1024 * 1024 * 1024)
-    elif unit in ['ti', 't', 'tib']:
-        return int(num * 1024 * 1024 * 1024 * 1024)
-    else:
-        return int(num) # Assume bytes if no unit or unknown unit
+    return int(num * _UNIT_MULT.get(unit, 1)) # Assume bytes if no unit or unknown unit
 
-def convert_memory_to_gib(value_with_unit):
-    mem_bytes = convert_memory_to_bytes(value_with_unit)
+def format_bytes_as_gib(mem_bytes):
     if mem_bytes <= 0:
         return ""
     gib = mem_bytes / (1024 * 1024 * 1024)
     return f"{gib:.2f}Gi"
 
-def convert_memory_to_mib(value_with_unit):
-    mem_bytes = convert_memory_to_bytes(value_with_unit)
+def format_bytes_as_mib(mem_bytes):
     if mem_bytes <= 0:
         return ""
     mib = mem_bytes / (1024 * 1024)
     return f"{mib:.0f}Mi" # Removed decimal points
 
+@lru_cache(maxsize=None)
+def convert_memory_to_gib(value_with_unit):
+    return format_bytes_as_gib(convert_memory_to_bytes(value_with_unit))
+
+@lru_cache(maxsize=None)
+def convert_memory_to_mib(value_with_unit):
+    return format_bytes_as_mib(convert_memory_to_bytes(value_with_unit))
+
+@lru_cache(maxsize=None)
 def format_cpu_cores(value):
-    if not value:
-        return ""
     if value.endswith('m'):
         millicores = float(value[:-1])
         cores = millicores / 1000
@@ -97,9 +199,8 @@ def format_cpu_cores(value):
         except ValueError:
             return value
 
+@lru_cache(maxsize=None)
 def format_cpu_m(value):
-    if not value:
-        return ""
     if value.endswith('m'):
         return value
     else:
@@ -110,222 +211,196 @@ def format_cpu_m(value):
         except ValueError:
             return value
 
-# --- Workload Resource Gathering Functions ---
-
-def get_workload_resources(namespace, workload_type, workload_name):
+@lru_cache(maxsize=None)
+def parse_cpu_m(value):
+    # CPU quantity ("250m", "0.5", "2") as integer millicores, for summing without string round trips
+    if value.endswith('m'):
+        value, scale = value[:-1], 1
+    else:
+        scale = 1000
+    if value.isdigit(): # Integer quantities, by far the most common, need no float parse
+        return int(value) * scale
     try:
-        json_output = run_command(f"oc get {workload_type} {workload_name} -n {namespace} -o json")
-        data = json.loads(json_output)
-    except Exception:
-        return []
+        return int(round(float(value) * scale))
+    except ValueError:
+        return 0
+
+# --- Workload Resource Gathering Functions ---
 
-    rows = []
+# Appends one value per container to each of the 8 workload CSV columns
+def get_workload_resources(namespace, workload_type, data, columns):
+    workload_name = data.get('metadata', {}).get('name', '')
+    (namespaces, workload_types, workload_names, container_names,
+     cpu_requests, memory_requests, cpu_limits, memory_limits) = columns
     containers = data.get('spec', {}).get('template', {}).get('spec', {}).get('containers', [])
 
     for container in containers:
-        container_name = container.get('name', '')
         resources = container.get('resources', {})
         requests = resources.get('requests', {})
         limits = resources.get('limits', {})
 
-        cpu_request = format_cpu_m(requests.get('cpu', ''))
-        memory_request = convert_memory_to_mib(requests.get('memory', ''))
-        cpu_limit = format_cpu_m(limits.get('cpu', ''))
-        memory_limit = convert_memory_to_mib(limits.get('memory', ''))
-
-        rows.append([
-            namespace,
-            workload_type,
-            workload_name,
-            container_name,
-            cpu_request,
-            memory_request,
-            cpu_limit,
-            memory_limit
-        ])
-    return rows
+        namespaces.append(namespace)
+        workload_types.append(workload_type)
+        workload_names.append(workload_name)
+        container_names.append(container.get('name', ''))
+
+        # Most containers leave some of these unset, so skip the helpers for empty values
+        cpu_request = requests.get('cpu', '')
+        memory_request = requests.get('memory', '')
+        cpu_limit = limits.get('cpu', '')
+        memory_limit = limits.get('memory', '')
+        cpu_requests.append(format_cpu_m(cpu_request) if cpu_request else '')
+        memory_requests.append(convert_memory_to_mib(memory_request) if memory_request else '')
+        cpu_limits.append(format_cpu_m(cpu_limit) if cpu_limit else '')
+        memory_limits.append(convert_memory_to_mib(memory_limit) if memory_limit else '')
 
 # --- Quota and Limit Range Gathering Functions ---
 
-def get_resource_quota_details(namespace, quota_name):
-    try:
-        json_output = run_command(f"oc get resourcequota {quota_name} -n {namespace} -o json")
-        data = json.loads(json_output)
-    except Exception:
-        return None
-
+# (quota key, formatter) in CSV column order; each key yields a Hard and a Used column.
+# The fields cpu_hard, cpu_used, memory_hard, memory_used were removed as they are not typically present directly
+QUOTA_FIELDS = [
+    ('pods', None),
+    ('requests.cpu', format_cpu_cores),
+    ('requests.memory', convert_memory_to_gib),
+    ('limits.cpu', format_cpu_cores),
+    ('limits.memory', convert_memory_to_gib),
+    ('persistentvolumeclaims', None),
+    ('requests.storage', convert_memory_to_gib),
+    ('configmaps', None),
+    ('secrets', None),
+    ('services', None),
+]
+
+# (limit type, section, resource, formatter) in CSV column order
+LIMIT_RANGE_FIELDS = [
+    ('Container', 'defaultRequest', 'cpu', format_cpu_m),
+    ('Container', 'defaultRequest', 'memory', convert_memory_to_mib),
+    ('Container', 'default', 'cpu', format_cpu_m),
+    ('Container', 'default', 'memory', convert_memory_to_mib),
+    ('Container', 'max', 'cpu', format_cpu_m),
+    ('Container', 'max', 'memory', convert_memory_to_mib),
+    ('Container', 'min', 'cpu', format_cpu_m),
+    ('Container', 'min', 'memory', convert_memory_to_mib),
+
+    ('Pod', 'max', 'cpu', format_cpu_m),
+    ('Pod', 'max', 'memory', convert_memory_to_mib),
+    ('Pod', 'min', 'cpu', format_cpu_m),
+    ('Pod', 'min', 'memory', convert_memory_to_mib),
+    ('Pod', 'defaultRequest', 'cpu', format_cpu_m),
+    ('Pod', 'defaultRequest', 'memory', convert_memory_to_mib),
+    ('Pod', 'default', 'cpu', format_cpu_m),
+    ('Pod', 'default', 'memory', convert_memory_to_mib),
+
+    ('PersistentVolumeClaim', 'default', 'storage', convert_memory_to_mib),
+    ('PersistentVolumeClaim', 'max', 'storage', convert_memory_to_mib),
+]
+
+def get_resource_quota_details(namespace, data):
+    quota_name = data.get('metadata', {}).get('name', '')
     spec_hard = data.get('spec', {}).get('hard', {})
     status_used = data.get('status', {}).get('used', {})
 
-    # The fields cpu_hard, cpu_used, memory_hard, memory_used were removed as they are not typically present directly
-    row = [
-        namespace,
-        quota_name,
-        spec_hard.get('pods', ''),
-        status_used.get('pods', ''),
-        format_cpu_cores(spec_hard.get('requests.cpu', '')),
-        format_cpu_cores(status_used.get('requests.cpu', '')),
-        convert_memory_to_gib(spec_hard.get('requests.memory', '')),
-        convert_memory_to_gib(status_used.get('requests.memory', '')),
-        format_cpu_cores(spec_hard.get('limits.cpu', '')),
-        format_cpu_cores(status_used.get('limits.cpu', '')),
-        convert_memory_to_gib(spec_hard.get('limits.memory', '')),
-        convert_memory_to_gib(status_used.get('limits.memory', '')),
-        spec_hard.get('persistentvolumeclaims', ''),
-        status_used.get('persistentvolumeclaims', ''),
-        convert_memory_to_gib(spec_hard.get('requests.storage', '')),
-        convert_memory_to_gib(status_used.get('requests.storage', '')),
-        spec_hard.get('configmaps', ''),
-        status_used.get('configmaps', ''),
-        spec_hard.get('secrets', ''),
-        status_used.get('secrets', ''),
-        spec_hard.get('services', ''),
-        status_used.get('services', '')
-    ]
+    row = [namespace, quota_name]
+    for key, formatter in QUOTA_FIELDS:
+        for values in (spec_hard, status_used):
+            value = values.get(key, '')
+            row.append(formatter(value) if formatter and value else value)
     return row
 
-def get_limit_range_details(namespace, limitrange_name):
-    try:
-        json_output = run_command(f"oc get limitrange {limitrange_name} -n {namespace} -o json")
-        data = json.loads(json_output)
-    except Exception:
-        return None
-
+def get_limit_range_details(namespace, data):
+    limitrange_name = data.get('metadata', {}).get('name', '')
     limits_map = {}
     for item in data.get('spec', {}).get('limits', []):
         limits_map[item.get('type')] = item
 
-    container_limits = limits_map.get('Container', {})
-    pod_limits = limits_map.get('Pod', {})
-    pvc_limits = limits_map.get('PersistentVolumeClaim', {})
-
-    row = [
-        namespace,
-        limitrange_name,
-        format_cpu_m(container_limits.get('defaultRequest', {}).get('cpu', '')),
-        convert_memory_to_mib(container_limits.get('defaultRequest', {}).get('memory', '')),
-        format_cpu_m(container_limits.get('default', {}).get('cpu', '')),
-        convert_memory_to_mib(container_limits.get('default', {}).get('memory', '')),
-        format_cpu_m(container_limits.get('max', {}).get('cpu', '')),
-        convert_memory_to_mib(container_limits.get('max', {}).get('memory', '')),
-        format_cpu_m(container_limits.get('min', {}).get('cpu', '')),
-        convert_memory_to_mib(container_limits.get('min', {}).get('memory', '')),
-
-        format_cpu_m(pod_limits.get('max', {}).get('cpu', '')),
-        convert_memory_to_mib(pod_limits.get('max', {}).get('memory', '')),
-        format_cpu_m(pod_limits.get('min', {}).get('cpu', '')),
-        convert_memory_to_mib(pod_limits.get('min', {}).get('memory', '')),
-        format_cpu_m(pod_limits.get('defaultRequest', {}).get('cpu', '')),
-        convert_memory_to_mib(pod_limits.get('defaultRequest', {}).get('memory', '')),
-        format_cpu_m(pod_limits.get('default', {}).get('cpu', '')),
-        convert_memory_to_mib(pod_limits.get('default', {}).get('memory', '')),
-
-        convert_memory_to_mib(pvc_limits.get('default', {}).get('storage', '')),
-        convert_memory_to_mib(pvc_limits.get('max', {}).get('storage', ''))
-    ]
+    row = [namespace, limitrange_name]
+    for limit_type, section, resource, formatter in LIMIT_RANGE_FIELDS:
+        value = limits_map.get(limit_type, {}).get(section, {}).get(resource, '')
+        row.append(formatter(value) if value else '')
     return row
 
 # --- Node Resource Gathering Functions ---
 
-def get_node_details(node_name):
-    node_summary_data = []
+# (cpu_req_m, cpu_limit_m, mem_req_bytes, mem_limit_bytes) for a resources-style dict of requests and limits
+def get_resource_totals(requests, limits):
+    cpu_request = requests.get('cpu')
+    cpu_limit = limits.get('cpu')
+    memory_request = requests.get('memory')
+    memory_limit = limits.get('memory')
+    return (
+        parse_cpu_m(cpu_request) if cpu_request else 0,
+        parse_cpu_m(cpu_limit) if cpu_limit else 0,
+        convert_memory_to_bytes(memory_request) if memory_request else 0,
+        convert_memory_to_bytes(memory_limit) if memory_limit else 0,
+    )
+
+def get_container_totals(container):
+    resources = container.get('resources', {})
+    return get_resource_totals(resources.get('requests', {}), resources.get('limits', {}))
+
+# Effective pod requests/limits, computed like 'oc describe node' (kubectl resourcehelper) does:
+# max(sum(containers) + restartable init sidecars, largest init container) plus spec.overhead
+def get_pod_totals(pod):
+    spec = pod.get('spec', {})
+
+    totals = [0, 0, 0, 0]
+    for container in spec.get('containers', []):
+        totals = [t + v for t, v in zip(totals, get_container_totals(container))]
+
+    sidecar_totals = [0, 0, 0, 0]
+    init_totals = [0, 0, 0, 0]
+    for container in spec.get('initContainers', []):
+        values = get_container_totals(container)
+        if container.get('restartPolicy') == 'Always':
+            # Sidecars keep running next to the app containers and later init containers
+            totals = [t + v for t, v in zip(totals, values)]
+            sidecar_totals = [t + v for t, v in zip(sidecar_totals, values)]
+            values = sidecar_totals
+        else:
+            values = [v + s for v, s in zip(values, sidecar_totals)]
+        init_totals = [max(t, v) for t, v in zip(init_totals, values)]
+    totals = [max(t, i) for t, i in zip(totals, init_totals)]
+
+    # Overhead always adds to requests, but only to limits that are set
+    overhead = spec.get('overhead') or {}
+    cpu_overhead_m, _, mem_overhead_bytes, _ = get_resource_totals(overhead, {})
+    cpu_req_m, cpu_limit_m, mem_req_bytes, mem_limit_bytes = totals
+    return (
+        cpu_req_m + cpu_overhead_m,
+        cpu_limit_m + cpu_overhead_m if cpu_limit_m else 0,
+        mem_req_bytes + mem_overhead_bytes,
+        mem_limit_bytes + mem_overhead_bytes if mem_limit_bytes else 0,
+    )
+
+def get_node_details(node_data, pods):
+    cpu_capacity_raw = node_data.get('status', {}).get('capacity', {}).get('cpu', '')
+    mem_capacity_raw = node_data.get('status', {}).get('capacity', {}).get('memory', '')
+
+    mem_capacity_formatted = convert_memory_to_gib(mem_capacity_raw) if mem_capacity_raw else ''
+    cpu_capacity_formatted = format_cpu_cores(cpu_capacity_raw) if cpu_capacity_raw else ''
+
+    pod_totals = []
     pod_details_data = []
 
-    try:
-        node_json_output = run_command(f"oc get node {node_name} -o json")
-        node_data = json.loads(node_json_output)
-    except Exception:
-        return None, None # Return None for both if node data can't be fetched
+    for pod in pods:
+        p_cpu_req_m, p_cpu_limit_m, p_mem_req_bytes, p_mem_limit_bytes = get_pod_totals(pod)
+        pod_totals.append((p_cpu_req_m, p_cpu_limit_m, p_mem_req_bytes, p_mem_limit_bytes))
 
-    cpu_capacity_raw = node_data.get('status', {}).get('capacity', {}).get('cpu', '')
-    mem_capacity_raw = node_data.get('status', {}).get('capacity', {}).get('memory', '')
+        metadata = pod.get('metadata', {})
+        pod_details_data.append([
+            metadata.get('namespace', ''), metadata.get('name', ''),
+            f"{p_cpu_req_m}m", f"{p_cpu_limit_m}m",
+            format_bytes_as_mib(p_mem_req_bytes), format_bytes_as_mib(p_mem_limit_bytes)
+        ])
 
-    mem_capacity_formatted = convert_memory_to_gib(mem_capacity_raw)
-    cpu_capacity_formatted = format_cpu_cores(cpu_capacity_raw)
-
-    node_describe_output = run_command(f"oc describe node {node_name}", ignore_errors=True)
-
-    cpu_req, cpu_limit, mem_req_raw, mem_limit_raw, num_pods = "", "", "", "", "0"
-
-    if node_describe_output:
-        # Extract allocated resources
-        allocated_resources_block = []
-        in_block = False
-        for line in node_describe_output.splitlines():
-            if "Allocated resources:" in line:
-                in_block = True
-                continue
-            if "Events:" in line:
-                in_block = False
-            if in_block and "Total limits may exceed allocatable resources" not in line and "Resource           Requests         Limits" not in line:
-                allocated_resources_block.append(line.strip())
-
-        for line in allocated_resources_block:
-            parts = line.split()
-            if "cpu" in parts:
-                cpu_req = parts[1] if len(parts) > 1 else ""
-                cpu_limit = parts[3] if len(parts) > 3 else ""
-            elif "memory" in parts:
-                mem_req_raw = parts[1] if len(parts) > 1 else ""
-                mem_limit_raw = parts[3] if len(parts) > 3 else ""
-        
-        # Extract non-terminated pods count
-        pods_match = re.search(r"Non-terminated Pods:\s*\([0-9]+\s*in\s*total\)", node_describe_output)
-        if pods_match:
-            num_pods_line = pods_match.group(0)
-            num_pods_match = re.search(r"\(([0-9]+)\s*in\s*total\)", num_pods_line)
-            if num_pods_match:
-                num_pods = num_pods_match.group(1)
-
-        # Extract non-terminated pods details
-        non_terminated_pods_block = []
-        in_pods_block = False
-        lines_skipped = 0
-        for line in node_describe_output.splitlines():
-            if "Non-terminated Pods:" in line:
-                in_pods_block = True
-                lines_skipped = 0 # Reset for new block
-                continue
-            if "Allocated resources:" in line: # Stop when hitting the next section
-                in_pods_block = False
-            if in_pods_block:
-                if lines_skipped < 2: # Skip header and dashes
-                    lines_skipped += 1
-                    continue
-                non_terminated_pods_block.append(line.strip())
-
-        for pod_line in non_terminated_pods_block:
-            if not pod_line:
-                continue
-            parts = pod_line.split()
-            if len(parts) >= 9: # Ensure enough columns for parsing
-                ns_name = parts[0]
-                p_name = parts[1]
-                p_cpu_req_raw = parts[2]
-                p_cpu_limit_raw = parts[4]
-                p_mem_req_raw = parts[6]
-                p_mem_limit_raw = parts[8]
-
-                p_cpu_req_formatted = format_cpu_m(p_cpu_req_raw)
-                p_cpu_limit_formatted = format_cpu_m(p_cpu_limit_raw)
-                p_mem_req_formatted = convert_memory_to_mib(p_mem_req_raw)
-                p_mem_limit_formatted = convert_memory_to_mib(p_mem_limit_raw)
-
-                pod_details_data.append([
-                    ns_name, p_name, p_cpu_req_formatted, p_cpu_limit_formatted,
-                    p_mem_req_formatted, p_mem_limit_formatted
-                ])
-
-    mem_req_formatted = convert_memory_to_gib(mem_req_raw)
-    mem_limit_formatted = convert_memory_to_gib(mem_limit_raw)
-    cpu_req_formatted = format_cpu_cores(cpu_req)
-    cpu_limit_formatted = format_cpu_cores(cpu_limit)
+    # Node totals are a column-wise reduction over the per-pod integers, formatted once per node
+    cpu_req_m, cpu_limit_m, mem_req_bytes, mem_limit_bytes = (sum(column) for column in zip(*pod_totals)) if pod_totals else (0, 0, 0, 0)
 
     node_summary_data = [
-        cpu_req_formatted, cpu_limit_formatted,
-        mem_req_formatted, mem_limit_formatted,
+        format_cpu_cores(f"{cpu_req_m}m"), format_cpu_cores(f"{cpu_limit_m}m"),
+        format_bytes_as_gib(mem_req_bytes), format_bytes_as_gib(mem_limit_bytes),
         cpu_capacity_formatted, mem_capacity_formatted,
-        num_pods
+        str(len(pods))
     ]
 
     return node_summary_data, pod_details_data
@@ -347,13 +422,9 @@ def main():
     check_prerequisites()
 
     # Get namespaces
-    namespaces_str = run_command("oc get projects -o jsonpath='{.items[*].metadata.name}'", ignore_errors=True)
+    namespaces_str = run_command(["oc", "get", "projects", "-o", "jsonpath={.items[*].metadata.name}"])
     NAMESPACES = namespaces_str.split() if namespaces_str else []
 
-    # Get node names
-    nodes_str = run_command("oc get nodes -o jsonpath='{.items[*].metadata.name}'", ignore_errors=True)
-    NODES = nodes_str.split() if nodes_str else []
-
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_dir = f"resource-gather_{timestamp}"
     os.makedirs(output_dir, exist_ok=True)
@@ -365,23 +436,24 @@ def main():
         print(f"Gathering workload resource requests and limits. Output will be saved to '{workload_output_file}'.")
         print()
 
-        with open(workload_output_file, 'w', newline='') as f:
+        # One cluster-wide list per workload type, so a missing API (e.g. DeploymentConfig) only drops its own type
+        workloads_by_type = {workload_type: group_by_namespace(fetch_all(workload_type, namespaces=NAMESPACES)) for workload_type in WORKLOAD_TYPES}
+
+        # Columnar layout: one list per CSV column, zipped back into rows only when writing
+        workload_columns = [[] for _ in workload_csv_header]
+        for ns in NAMESPACES:
+            for workload_type in WORKLOAD_TYPES:
+                for workload in workloads_by_type[workload_type].get(ns, []):
+                    get_workload_resources(ns, workload_type, workload, workload_columns)
+
+        with open(workload_output_file, 'w', newline='', buffering=CSV_BUFFER_SIZE) as f:
             writer = csv.writer(f)
             writer.writerow(workload_csv_header)
+            write_plain_rows(f, writer, zip(*workload_columns))
             if args.debug:
                 print(','.join(workload_csv_header))
-
-            for ns in NAMESPACES:
-                for workload_type in ["deployment", "deploymentconfig", "statefulset"]:
-                    workload_names_str = run_command(f"oc get {workload_type} -n {ns} -o jsonpath='{{.items[*].metadata.name}}'", ignore_errors=True)
-                    workload_names = workload_names_str.split() if workload_names_str else []
-
-                    for workload_name in workload_names:
-                        resource_data = get_workload_resources(ns, workload_type, workload_name)
-                        for row in resource_data:
-                            writer.writerow(row)
-                            if args.debug:
-                                print(','.join(row))
+                for row in zip(*workload_columns):
+                    print(','.join(row))
         print("\nWorkload data collection complete. Output saved to '{workload_output_file}'.")
 
     if args.quotas_limits:
@@ -406,42 +478,37 @@ def main():
         print(f"Gathering resource quota and limit range details. Output will be saved to '{quotas_output_file}'.")
         print()
 
-        with open(quotas_output_file, 'w', newline='') as f:
+        quotas_by_namespace = group_by_namespace(fetch_all("resourcequotas", namespaces=NAMESPACES))
+        limit_ranges_by_namespace = group_by_namespace(fetch_all("limitranges", namespaces=NAMESPACES))
+
+        quota_rows = []
+        limit_rows = []
+        for ns in NAMESPACES:
+            for rq in quotas_by_namespace.get(ns, []):
+                quota_rows.append(get_resource_quota_details(ns, rq))
+            for lr in limit_ranges_by_namespace.get(ns, []):
+                limit_rows.append(get_limit_range_details(ns, lr))
+
+        with open(quotas_output_file, 'w', newline='', buffering=CSV_BUFFER_SIZE) as f:
             writer = csv.writer(f)
 
             writer.writerow(["# --- Resource Quotas ---"])
             writer.writerow(quota_csv_header)
+            writer.writerows(quota_rows)
             if args.debug:
                 print("--- Resource Quotas ---")
                 print(','.join(quota_csv_header))
-
-            for ns in NAMESPACES:
-                resource_quotas_str = run_command(f"oc get resourcequotas -n {ns} -o jsonpath='{{.items[*].metadata.name}}'", ignore_errors=True)
-                resource_quotas = resource_quotas_str.split() if resource_quotas_str else []
-
-                for rq in resource_quotas:
-                    quota_data = get_resource_quota_details(ns, rq)
-                    if quota_data:
-                        writer.writerow(quota_data)
-                        if args.debug:
-                            print(','.join(quota_data))
+                for quota_data in quota_rows:
+                    print(','.join(quota_data))
 
             writer.writerow(["# --- Limit Ranges ---"])
             writer.writerow(limitrange_csv_header)
+            writer.writerows(limit_rows)
             if args.debug:
                 print("\n--- Limit Ranges ---")
                 print(','.join(limitrange_csv_header))
-
-            for ns in NAMESPACES:
-                limit_ranges_str = run_command(f"oc get limitranges -n {ns} -o jsonpath='{{.items[*].metadata.name}}'", ignore_errors=True)
-                limit_ranges = limit_ranges_str.split() if limit_ranges_str else []
-
-                for lr in limit_ranges:
-                    limit_data = get_limit_range_details(ns, lr)
-                    if limit_data:
-                        writer.writerow(limit_data)
-                        if args.debug:
-                            print(','.join(limit_data))
+                for limit_data in limit_rows:
+                    print(','.join(limit_data))
         print(f"\nQuotas and Limit Ranges data collection complete. Output saved to '{quotas_output_file}'.")
 
     if args.nodes:
@@ -452,35 +519,42 @@ def main():
         print(f"Gathering node resource requests, limits, and pod counts. Output will be saved to '{nodes_output_file}'.")
         print()
 
-        with open(nodes_output_file, 'w', newline='') as f:
+        with open(nodes_output_file, 'w', newline='', buffering=CSV_BUFFER_SIZE) as f:
             writer = csv.writer(f)
             if args.debug:
                 print("--- Node Details ---")
 
-            for node in NODES:
-                node_summary_data, pod_details_data = get_node_details(node)
-                if node_summary_data is not None:
-                    writer.writerow([f"# --- {node} ---"])
-                    writer.writerow(node_summary_csv_header)
-                    writer.writerow(node_summary_data)
-                    writer.writerow(["# --- Pods ---"])
-                    writer.writerow(pod_details_csv_header)
-                    writer.writerows(pod_details_data)
-                    
-                    # Add 3 empty rows after each node's block
-                    writer.writerow([])
-                    writer.writerow([])
-                    writer.writerow([])
-
-                    if args.debug:
-                        print(f"# --- {node} ---")
-                        print(','.join(node_summary_csv_header))
-                        print(','.join(node_summary_data))
-                        print("# --- Pods ---")
-                        print(','.join(pod_details_csv_header))
-                        for pod_row in pod_details_data:
-                            print(','.join(pod_row))
-                        print("\n\n") # 3 newlines for readability in debug
+            # Non-terminated pods across the cluster, bucketed by the node they are scheduled on
+            pods_by_node = defaultdict(list)
+            for pod in fetch_all("pods", field_selector="status.phase!=Succeeded,status.phase!=Failed", namespaces=NAMESPACES):
+                node_name = pod.get('spec', {}).get('nodeName')
+                if node_name:
+                    pods_by_node[node_name].append(pod)
+
+            for node_data in get_items(["oc", "get", "nodes", "-o", "json"]) or []:
+                node = node_data.get('metadata', {}).get('name', '')
+                node_summary_data, pod_details_data = get_node_details(node_data, pods_by_node.get(node, []))
+                writer.writerow([f"# --- {node} ---"])
+                writer.writerow(node_summary_csv_header)
+                writer.writerow(node_summary_data)
+                writer.writerow(["# --- Pods ---"])
+                writer.writerow(pod_details_csv_header)
+                write_plain_rows(f, writer, pod_details_data)
+
+                # Add 3 empty rows after each node's block
+                writer.writerow([])
+                writer.writerow([])
+                writer.writerow([])
+
+                if args.debug:
+                    print(f"# --- {node} ---")
+                    print(','.join(node_summary_csv_header))
+                    print(','.join(node_summary_data))
+                    print("# --- Pods ---")
+                    print(','.join(pod_details_csv_header))
+                    for pod_row in pod_details_data:
+                        print(','.join(pod_row))
+                    print("\n\n") # 3 newlines for readability in debug
 
         print(f"\nNode data collection complete. Output saved to '{nodes_output_file}'.")
     